@@ -6,6 +6,8 @@ Usage:
   registries-conf-ctl [options] add-mirror <registry> <mirror> [--insecure] [--http]
   registries-conf-ctl [options] list-mirrors <registry>
   registries-conf-ctl [options] add-registry <registry> [--location=location] [--insecure] [--unqualified-search]
+  registries-conf-ctl [options] export-compiled <snapshot>
+  registries-conf-ctl [options] check-compiled <snapshot>
   registries-conf-ctl -h | --help
   registries-conf-ctl --version
 
@@ -16,14 +18,28 @@ Options:
   --docker       Treat `--conf` as a docker config file
   --insecure     Mark registry as insecure
   --http         HTTP registry mirror (Docker only)
+  --reload       Signal the container runtime, if the registry configuration changed
+  --reload-delay=<seconds>  Coalesce reloads of consecutive calls within this window [default: 0]
+  --reload-state=<dir>      Directory for pending reloads [default: /run/registries-conf-ctl]
+  --docker-pidfile=<pidfile>  dockerd pid file [default: /var/run/docker.pid]
+  --crio-pidfile=<pidfile>    CRI-O pid file [default: /var/run/crio/crio.pid]
 """
 from __future__ import print_function
 
+import errno
+import hashlib
+import io
+import mmap
+import os
+import signal
+import struct
 import sys
+import time
+import uuid
 from collections import namedtuple
 
 import json
-from typing import Dict, Any, cast, TextIO, TypeVar, Iterable, Callable, List, Type
+from typing import Dict, Any, cast, TextIO, TypeVar, Iterable, Callable, List, Type, Optional, Set, Iterator, Tuple
 
 T = TypeVar('T')
 U = TypeVar('U')
@@ -74,7 +90,9 @@ class Mirror(namedtuple('Mirror', 'location insecure http')):
     @classmethod
     def from_docker(cls, mirror):
         # type: (str) -> Mirror
-        location = mirror.lstrip('http://').lstrip('https://')
+        location = mirror
+        if mirror.startswith(('http://', 'https://')):
+            location = mirror.split('://', 1)[-1]
         if mirror.startswith('http://'):
             return cls(location=location, insecure=False, http=True)
         return cls(location=location, insecure=False, http=False)
@@ -116,6 +134,8 @@ class Reg(namedtuple('Reg', 'prefix location insecure blocked mirror unqualified
 
 
 class Fmt(object):
+    runtime = None  # type: Optional[str]
+
     def __init__(self, config):
         # type: (Dict[str, Reg]) -> None
         self.config = config
@@ -159,12 +179,18 @@ class Fmt(object):
         # type: () -> dict
         raise NotImplementedError
 
+    def registry_state(self):
+        # type: () -> dict
+        """The part of the config, the container runtime needs to reload"""
+        return self.dump_json()
+
     def dump(self):
         # type: () -> str
         raise NotImplementedError
 
 
 class RegistriesConfV2(Fmt):
+    runtime = 'crio'
 
     def __init__(self, f, allow_empty_config=False):
         # type: (TextIO, bool) -> None
@@ -235,6 +261,8 @@ class RegistriesConfV2(Fmt):
 
 
 class DockerDaemonJson(Fmt):
+    runtime = 'docker'
+
     def __init__(self, f):
         # type: (TextIO) -> None
         self.docker_config = json.load(f)  # type: Dict[str, Any]
@@ -249,7 +277,8 @@ class DockerDaemonJson(Fmt):
         if 'docker.io' not in regs:
             regs['docker.io'] = Reg('docker.io', 'docker.io')  # type: ignore
 
-        regs['docker.io'] = regs['docker.io']._replace(mirror={m: Mirror.from_docker(m) for m in self.docker_config.get('registry-mirrors', [])})
+        mirrors = [Mirror.from_docker(m) for m in self.docker_config.get('registry-mirrors', [])]
+        regs['docker.io'] = regs['docker.io']._replace(mirror={m.location: m for m in mirrors})
         super(DockerDaemonJson, self).__init__(regs)
 
     def dump_json(self):
@@ -260,11 +289,397 @@ class DockerDaemonJson(Fmt):
         self.docker_config['registry-mirrors'] = list(sorted(m.to_docker() for m in self.config['docker.io'].mirror.values()))
         return self.docker_config
 
+    def registry_state(self):
+        # type: () -> dict
+        d = self.dump_json()
+        return {k: d[k] for k in ('insecure-registries', 'registry-mirrors')}
+
     def dump(self):
         # type: () -> str
         return json.dumps(self.dump_json())
 
 
+class Reloader(object):
+    """
+    Sends SIGHUP to the container runtimes, whose registry configuration changed.
+
+    All changes of one call result in a single signal per runtime. With a
+    `delay`, the signal is sent by a background process after `delay` seconds,
+    unless a later call changed the configuration in the meantime.
+    """
+    def __init__(self, pidfiles, delay=0, state_dir='/run/registries-conf-ctl'):
+        # type: (Dict[str, str], float, str) -> None
+        self.pidfiles = pidfiles
+        self.delay = delay
+        self.state_dir = state_dir
+        self.pending = set()  # type: Set[str]
+
+    @classmethod
+    def from_arguments(cls, arguments):
+        # type: (dict) -> Reloader
+        try:
+            delay = float(arguments['--reload-delay'])
+        except ValueError:
+            delay = -1
+        # also rejects nan
+        if not 0 <= delay < float('inf'):
+            raise CLIError('Invalid --reload-delay: {d}'.format(d=arguments['--reload-delay']))
+        return cls({
+            'docker': arguments['--docker-pidfile'],
+            'crio': arguments['--crio-pidfile'],
+        }, delay=delay, state_dir=arguments['--reload-state'])
+
+    def mark(self, runtime):
+        # type: (str) -> None
+        self.pending.add(runtime)
+
+    def flush(self):
+        # type: () -> None
+        runtimes = sorted(self.pending)
+        self.pending = set()
+        if not runtimes:
+            return
+        if not self.delay:
+            for runtime in runtimes:
+                self.signal(runtime)
+            return
+
+        # Fail in the foreground, if we won't be able to reload later on.
+        for runtime in runtimes:
+            self._read_pid(runtime)
+        tokens = {runtime: self._write_token(runtime) for runtime in runtimes}
+        if os.fork() != 0:
+            return
+        # Detach, so that our caller doesn't wait for us.
+        try:
+            os.setsid()
+            devnull = os.open(os.devnull, os.O_RDWR)
+            for fd in (0, 1, 2):
+                os.dup2(devnull, fd)
+            time.sleep(self.delay)
+            for runtime, token in tokens.items():
+                if self._read_token(runtime) != token:
+                    # a later call is going to reload.
+                    continue
+                os.remove(self._token_path(runtime))
+                try:
+                    self.signal(runtime)
+                except CLIError:
+                    # Nobody is listening anymore.
+                    pass
+        finally:
+            os._exit(0)
+
+    def _read_pid(self, runtime):
+        # type: (str) -> int
+        pidfile = self.pidfiles[runtime]
+        try:
+            with open(pidfile) as f:
+                return int(f.read().strip())
+        except (EnvironmentError, ValueError) as e:
+            raise CLIError('Failed to reload {runtime} ({pidfile}): {e}'.format(
+                runtime=runtime, pidfile=pidfile, e=e))
+
+    def signal(self, runtime):
+        # type: (str) -> None
+        pid = self._read_pid(runtime)
+        try:
+            os.kill(pid, signal.SIGHUP)
+        except EnvironmentError as e:
+            raise CLIError('Failed to reload {runtime} ({pidfile}): {e}'.format(
+                runtime=runtime, pidfile=self.pidfiles[runtime], e=e))
+
+    def _token_path(self, runtime):
+        # type: (str) -> str
+        return os.path.join(self.state_dir, '{runtime}.pending'.format(runtime=runtime))
+
+    def _write_token(self, runtime):
+        # type: (str) -> str
+        token = uuid.uuid4().hex
+        tmp = '{path}.{pid}'.format(path=self._token_path(runtime), pid=os.getpid())
+        try:
+            if not os.path.isdir(self.state_dir):
+                os.makedirs(self.state_dir)
+            with open(tmp, 'w') as f:
+                f.write(token)
+            os.rename(tmp, self._token_path(runtime))
+        except EnvironmentError as e:
+            raise CLIError('Failed to write {state}: {e}'.format(state=self.state_dir, e=e))
+        return token
+
+    def _read_token(self, runtime):
+        # type: (str) -> Optional[str]
+        try:
+            with open(self._token_path(runtime)) as f:
+                return f.read()
+        except EnvironmentError:
+            return None
+
+
+class StaleSnapshotError(CLIError):
+    pass
+
+
+class CompiledRegistries(object):
+    """
+    Read-only, mmap-able snapshot of the merged registry configuration.
+
+    All integers are little-endian uint32. Layout::
+
+        header    magic, version, #registries, #mirrors, #sources,
+                  registry table offset, mirror table offset,
+                  source table offset, string pool offset,
+                  sha256 of the source files
+        registry  prefix (offset, length), location (offset, length),
+                  flags, first mirror, #mirrors. Sorted by prefix.
+        mirror    location (offset, length), flags
+        source    path (offset, length)
+        pool      UTF-8 strings. Offsets are relative to the pool.
+
+    The sections are stored in this order and must not overlap.
+
+    Lookups binary search the registry table and don't deserialize the
+    snapshot. Wildcard prefixes (`*.example.com`) are stored verbatim in the
+    same table and match any subdomain of the image's registry host. Of all
+    matching prefixes, the one covering the longest part of the image
+    reference wins; a plain prefix wins over a wildcard covering the same
+    part.
+    """
+    MAGIC = b'RCCSNAP\0'
+    VERSION = 1
+    HEADER = struct.Struct('<8s8I32s')
+    REGISTRY = struct.Struct('<7I')
+    MIRROR = struct.Struct('<3I')
+    SOURCE = struct.Struct('<2I')
+
+    REG_INSECURE = 1
+    REG_BLOCKED = 2
+    REG_UNQUALIFIED_SEARCH = 4
+    MIRROR_INSECURE = 1
+    MIRROR_HTTP = 2
+
+    def __init__(self, fname, check_sources=True):
+        # type: (str, bool) -> None
+        self.fname = fname
+        try:
+            with open(fname, 'rb') as f:
+                self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise CLIError('Failed to load {f}: empty file'.format(f=fname))
+        except EnvironmentError as e:
+            raise CLIError('Failed to load {f}: {e}'.format(f=fname, e=e))
+        try:
+            self._load_header()
+            if check_sources:
+                self.check_sources()
+        except Exception:
+            self.close()
+            raise
+
+    def _load_header(self):
+        # type: () -> None
+        if len(self.buf) < self.HEADER.size:
+            raise self._truncated()
+        (magic, version, self.reg_count, self.mirror_count, self.source_count, self.reg_off,
+         self.mirror_off, self.source_off, self.pool_off, self.digest) = self.HEADER.unpack_from(self.buf, 0)
+        if magic != self.MAGIC:
+            raise CLIError('Failed to load {f}: unknown file'.format(f=self.fname))
+        if version != self.VERSION:
+            raise CLIError('Failed to load {f}: unsupported version {v}'.format(f=self.fname, v=version))
+        sections = [
+            (self.HEADER.size, 0),
+            (self.reg_off, self.reg_count * self.REGISTRY.size),
+            (self.mirror_off, self.mirror_count * self.MIRROR.size),
+            (self.source_off, self.source_count * self.SOURCE.size),
+            (self.pool_off, 0),
+        ]
+        for (off, size), (next_off, _) in zip(sections, sections[1:]):
+            if off + size > next_off:
+                raise self._truncated()
+        if self.pool_off > len(self.buf):
+            raise self._truncated()
+        self.pool_len = len(self.buf) - self.pool_off
+
+    def _truncated(self):
+        # type: () -> CLIError
+        return CLIError('Failed to load {f}: truncated file'.format(f=self.fname))
+
+    def close(self):
+        # type: () -> None
+        self.buf.close()
+
+    def __enter__(self):
+        # type: () -> CompiledRegistries
+        return self
+
+    def __exit__(self, *args):
+        # type: (Any) -> None
+        self.close()
+
+    @staticmethod
+    def read_sources(fnames):
+        # type: (Iterable[str]) -> List[Tuple[str, Optional[bytes]]]
+        """Contents of the source files. `None` for missing ones"""
+        sources = []  # type: List[Tuple[str, Optional[bytes]]]
+        for fname in fnames:
+            try:
+                with open(fname, 'rb') as f:
+                    sources.append((fname, f.read()))
+            except EnvironmentError as e:
+                if e.errno != errno.ENOENT:
+                    raise CLIError('Failed to read {fname}: {e}'.format(fname=fname, e=e))
+                sources.append((fname, None))
+        return sources
+
+    @staticmethod
+    def digest_sources(sources):
+        # type: (Iterable[Tuple[str, Optional[bytes]]]) -> bytes
+        h = hashlib.sha256()
+        for fname, content in sources:
+            h.update(fname.encode('utf-8') + b'\0')
+            if content is None:
+                h.update(b'-')
+                continue
+            h.update(struct.pack('<Q', len(content)) + content)
+        return h.digest()
+
+    @classmethod
+    def compile(cls, config, sources):
+        # type: (Dict[str, Reg], List[Tuple[str, Optional[bytes]]]) -> bytes
+        pool = bytearray()
+        interned = {}  # type: Dict[bytes, int]
+
+        def intern(s):
+            # type: (str) -> Any
+            b = s.encode('utf-8')
+            if b not in interned:
+                interned[b] = len(pool)
+                pool.extend(b)
+            return interned[b], len(b)
+
+        regs = sorted(config.values(), key=lambda r: r.prefix.encode('utf-8'))
+        reg_table = bytearray()
+        mirror_table = bytearray()
+        mirror_count = 0
+        for reg in regs:
+            flags = ((cls.REG_INSECURE if reg.insecure else 0) |
+                     (cls.REG_BLOCKED if reg.blocked else 0) |
+                     (cls.REG_UNQUALIFIED_SEARCH if reg.unqualified_search else 0))
+            reg_table += cls.REGISTRY.pack(*(intern(reg.prefix) + intern(reg.location) +
+                                             (flags, mirror_count, len(reg.mirror))))
+            for m in reg.mirror.values():
+                flags = ((cls.MIRROR_INSECURE if m.insecure else 0) |
+                         (cls.MIRROR_HTTP if m.http else 0))
+                mirror_table += cls.MIRROR.pack(*(intern(m.location) + (flags,)))
+                mirror_count += 1
+        source_table = bytearray()
+        for source, _ in sources:
+            source_table += cls.SOURCE.pack(*intern(source))
+
+        reg_off = cls.HEADER.size
+        mirror_off = reg_off + len(reg_table)
+        source_off = mirror_off + len(mirror_table)
+        pool_off = source_off + len(source_table)
+        header = cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(regs), mirror_count, len(sources),
+                                 reg_off, mirror_off, source_off, pool_off,
+                                 cls.digest_sources(sources))
+        return bytes(header + reg_table + mirror_table + source_table + pool)
+
+    def _bytes(self, off, length):
+        # type: (int, int) -> bytes
+        if off + length > self.pool_len:
+            raise self._truncated()
+        start = self.pool_off + off
+        return self.buf[start:start + length]
+
+    def _str(self, off, length):
+        # type: (int, int) -> str
+        try:
+            return self._bytes(off, length).decode('utf-8')
+        except UnicodeDecodeError as e:
+            raise CLIError('Failed to load {f}: {e}'.format(f=self.fname, e=e))
+
+    def sources(self):
+        # type: () -> List[str]
+        return [self._str(*self.SOURCE.unpack_from(self.buf, self.source_off + i * self.SOURCE.size))
+                for i in range(self.source_count)]
+
+    def check_sources(self):
+        # type: () -> None
+        if self.digest_sources(self.read_sources(self.sources())) != self.digest:
+            raise StaleSnapshotError('{f} is stale: source files changed'.format(f=self.fname))
+
+    def _reg(self, i):
+        # type: (int) -> Reg
+        (prefix_off, prefix_len, location_off, location_len,
+         flags, mirror_start, mirror_count) = self.REGISTRY.unpack_from(self.buf, self.reg_off + i * self.REGISTRY.size)
+        if mirror_start + mirror_count > self.mirror_count:
+            raise self._truncated()
+        mirror = {}  # type: Dict[str, Mirror]
+        for j in range(mirror_start, mirror_start + mirror_count):
+            loc_off, loc_len, m_flags = self.MIRROR.unpack_from(self.buf, self.mirror_off + j * self.MIRROR.size)
+            loc = self._str(loc_off, loc_len)
+            mirror[loc] = Mirror(location=loc,  # type: ignore
+                                 insecure=bool(m_flags & self.MIRROR_INSECURE),
+                                 http=bool(m_flags & self.MIRROR_HTTP))
+        return Reg(prefix=self._str(prefix_off, prefix_len),  # type: ignore
+                   location=self._str(location_off, location_len),
+                   insecure=bool(flags & self.REG_INSECURE),
+                   blocked=bool(flags & self.REG_BLOCKED),
+                   mirror=mirror,
+                   unqualified_search=bool(flags & self.REG_UNQUALIFIED_SEARCH))
+
+    def _find(self, prefix):
+        # type: (bytes) -> Optional[int]
+        lo, hi = 0, self.reg_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            off, length = struct.unpack_from('<2I', self.buf, self.reg_off + mid * self.REGISTRY.size)
+            key = self._bytes(off, length)
+            if key == prefix:
+                return mid
+            if key < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def get(self, prefix):
+        # type: (str) -> Optional[Reg]
+        i = self._find(prefix.encode('utf-8'))
+        return None if i is None else self._reg(i)
+
+    def lookup(self, image):
+        # type: (str) -> Optional[Reg]
+        """The registry with the longest prefix matching `image`"""
+        b = image.encode('utf-8')
+        cuts = [i for i, c in enumerate(bytearray(b)) if c in bytearray(b'/:@')] + [len(b)]
+        match = None  # type: Optional[int]
+        match_len = 0
+        for cut in reversed(cuts):
+            match = self._find(b[:cut])
+            if match is not None:
+                match_len = cut
+                break
+
+        # Wildcards only match the host, i.e. up to the port or the first `/`.
+        host_len = ([i for i, c in enumerate(bytearray(b)) if c in bytearray(b'/:')] + [len(b)])[0]
+        if match_len < host_len:
+            host = b[:host_len]
+            for dot in [i for i, c in enumerate(bytearray(host)) if c == ord('.') and i > 0]:
+                i = self._find(b'*' + host[dot:])
+                if i is not None:
+                    match = i
+                    break
+
+        return None if match is None else self._reg(match)
+
+    def __iter__(self):
+        # type: () -> Iterator[Reg]
+        for i in range(self.reg_count):
+            yield self._reg(i)
+
+
 def _raise_if_all_fail(l, f, what):
     # type: (Iterable[T], Callable[[T], U], str) -> U
     es = []  # type: List[Exception]
@@ -277,14 +692,26 @@ def _raise_if_all_fail(l, f, what):
     raise CLIError('{what}:\n{details}'.format(what=what,details=details))
 
 
-def execute_for_file(fname, arguments):
-    # type: (str, dict) -> None
+def _write_and_mark(fname, fmt, before, reloader):
+    # type: (str, Fmt, dict, Optional[Reloader]) -> None
+    with open(fname, 'w') as f:
+        f.write(fmt.dump())
+    if reloader is not None and fmt.runtime is not None and fmt.registry_state() != before:
+        reloader.mark(fmt.runtime)
+
+
+def _conf_type(fname, arguments):
+    # type: (str, dict) -> Type[Fmt]
     if arguments['--docker']:
-        conf_type = DockerDaemonJson  # type: Type[Fmt]
-    else:
-        conf_type = {
-            '/etc/docker/daemon.json': DockerDaemonJson
-        }.get(fname, RegistriesConfV2)
+        return DockerDaemonJson
+    return {
+        '/etc/docker/daemon.json': DockerDaemonJson
+    }.get(fname, RegistriesConfV2)
+
+
+def execute_for_file(fname, arguments, reloader=None):
+    # type: (str, dict, Optional[Reloader]) -> None
+    conf_type = _conf_type(fname, arguments)
 
     if arguments['add-mirror']:
         with open(fname) as f:
@@ -294,11 +721,11 @@ def execute_for_file(fname, arguments):
                 return cls(f)
             fmt = fun(conf_type)
 
+        before = fmt.registry_state()
         fmt.add_mirror(arguments['<registry>'], arguments['<mirror>'],
                        arguments['--insecure'], arguments['--http'])
 
-        with open(fname, 'w') as f:
-            f.write(fmt.dump())
+        _write_and_mark(fname, fmt, before, reloader)
     if arguments['list-mirrors']:
         with open(fname) as f:
             def fun(cls):
@@ -317,18 +744,90 @@ def execute_for_file(fname, arguments):
                 return cls(f, allow_empty_config=True)
 
             fmt = fun(conf_type)
+        before = fmt.registry_state()
         fmt.add_registry(arguments['<registry>'], arguments['--location'],
                          arguments['--insecure'], arguments['--unqualified-search'])
 
-        with open(fname, 'w') as f:
-            f.write(fmt.dump())
+        _write_and_mark(fname, fmt, before, reloader)
+
+
+def merged_config(sources, arguments):
+    # type: (List[Tuple[str, Optional[bytes]]], dict) -> Dict[str, Reg]
+    """Registries of all existing config files. Earlier files take precedence"""
+    merged = {}  # type: Dict[str, Reg]
+    found = False
+    for fname, content in sources:
+        if content is None:
+            continue
+        try:
+            f = io.StringIO(content.decode('utf-8'))
+        except UnicodeDecodeError as e:
+            raise CLIError('Failed to read {fname}: {e}'.format(fname=fname, e=e))
+        f.name = fname  # type: ignore
+
+        def fun(cls):
+            # type: (Any) -> Any
+            f.seek(0)
+            if cls is RegistriesConfV2:
+                return cls(f, allow_empty_config=True)
+            return cls(f)
+        conf_types = [DockerDaemonJson] if arguments['--docker'] else [DockerDaemonJson, RegistriesConfV2]
+        fmt = _raise_if_all_fail(conf_types, fun, "Failed to read {fname}".format(fname=fname))  # type: Fmt
+        found = True
+        for prefix, reg in fmt.config.items():
+            if prefix not in merged:
+                merged[prefix] = reg
+                continue
+            mirror = dict(merged[prefix].mirror)
+            for loc, m in reg.mirror.items():
+                mirror.setdefault(loc, m)
+            merged[prefix] = merged[prefix]._replace(
+                insecure=merged[prefix].insecure or reg.insecure,
+                blocked=merged[prefix].blocked or reg.blocked,
+                unqualified_search=merged[prefix].unqualified_search or reg.unqualified_search,
+                mirror=mirror)
+    if not found:
+        raise CLIError('Failed to read configuration: none of {fnames} exist'.format(
+            fnames=', '.join(fname for fname, _ in sources)))
+    return merged
+
+
+def export_compiled(arguments):
+    # type: (dict) -> None
+    # Absolute paths, as readers may run in a different directory.
+    fnames = [os.path.abspath(fname) for fname in arguments['--conf'].split(',')]
+    # Parse and hash the same contents, in case the files change in between.
+    sources = CompiledRegistries.read_sources(fnames)
+    data = CompiledRegistries.compile(merged_config(sources, arguments), sources)
+    snapshot = arguments['<snapshot>']
+    # Replace atomically: readers may have the old snapshot mapped.
+    tmp = '{snapshot}.{pid}'.format(snapshot=snapshot, pid=os.getpid())
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.rename(tmp, snapshot)
+    except EnvironmentError as e:
+        try:
+            os.remove(tmp)
+        except EnvironmentError:
+            pass
+        raise CLIError('Failed to write {snapshot}: {e}'.format(snapshot=snapshot, e=e))
 
 
 def run_all(arguments):
     # type: (dict) -> None
+    if arguments.get('export-compiled'):
+        export_compiled(arguments)
+        return
+    if arguments.get('check-compiled'):
+        CompiledRegistries(arguments['<snapshot>']).close()
+        return
+    reloader = Reloader.from_arguments(arguments) if arguments.get('--reload') else None
     _raise_if_all_fail(arguments['--conf'].split(','),
-                       lambda fname: execute_for_file(fname, arguments),
+                       lambda fname: execute_for_file(fname, arguments, reloader),
                        'Failed to read configuration')
+    if reloader is not None:
+        reloader.flush()
 
 
 def main():
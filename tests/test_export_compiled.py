@@ -0,0 +1,183 @@
+import subprocess
+
+import pytest
+
+from registries_conf_ctl import cli
+
+registries_conf = u"""
+unqualified-search-registries = ["docker.io", "quay.io"]
+
+[[registry]]
+prefix = "docker.io"
+location = "docker.io"
+
+[[registry.mirror]]
+location = "mirror.example.com:5000"
+insecure = true
+
+[[registry]]
+prefix = "quay.io/team"
+location = "registry.example.com/team"
+blocked = true
+
+[[registry]]
+prefix = "*.example.org"
+location = "wildcard.example.com"
+
+[[registry]]
+prefix = "exact.example.org"
+location = "exact.example.org"
+
+[[registry]]
+prefix = "localhost"
+location = "localhost"
+insecure = true
+"""
+
+daemon_json = u"""
+{
+    "registry-mirrors": ["http://docker-mirror.example.com", "https://harbor.example.com"],
+    "insecure-registries": ["insecure.example.com"]
+}
+"""
+
+
+@pytest.fixture
+def snapshot(tmpdir):
+    conf = tmpdir.join('registries.conf')
+    conf.write(registries_conf)
+    daemon = tmpdir.join('daemon.json')
+    daemon.write(daemon_json)
+    snap = tmpdir.join('registries.snap')
+    missing = tmpdir.join('missing.conf')
+    subprocess.check_call('registries-conf-ctl --conf {c},{d},{m} export-compiled {s}'.format(
+        c=conf, d=daemon, m=missing, s=snap), shell=True)
+    return conf, daemon, missing, snap
+
+
+def test_export_compiled(snapshot):
+    conf, daemon, missing, snap = snapshot
+    with cli.CompiledRegistries(str(snap)) as c:
+        check_snapshot(c, [str(conf), str(daemon), str(missing)])
+
+
+def check_snapshot(c, sources):
+    assert c.sources() == sources
+    assert [r.prefix for r in c] == ['*.example.org', 'docker.io', 'exact.example.org', 'insecure.example.com',
+                                     'localhost', 'quay.io', 'quay.io/team']
+
+    docker = c.get('docker.io')
+    assert docker.unqualified_search
+    assert list(docker.mirror.values()) == [
+        cli.Mirror('mirror.example.com:5000', insecure=True, http=False),
+        cli.Mirror('docker-mirror.example.com', insecure=False, http=True),
+        cli.Mirror('harbor.example.com', insecure=False, http=False),
+    ]
+    assert c.get('insecure.example.com').insecure
+    assert c.get('quay.io/team').blocked
+    assert c.get('quay.io/team').location == 'registry.example.com/team'
+    assert c.get('example.com') is None
+
+
+@pytest.mark.parametrize('image,prefix', [
+    ('docker.io/library/busybox:latest', 'docker.io'),
+    ('quay.io/team/image@sha256:abc', 'quay.io/team'),
+    ('quay.io/teamx/image', 'quay.io'),
+    ('localhost:5000/image', 'localhost'),
+    ('example.com/image', None),
+    ('foo.example.org/image', '*.example.org'),
+    ('a.b.example.org:5000/image', '*.example.org'),
+    ('exact.example.org/image', 'exact.example.org'),
+    ('example.org/image', None),
+    ('registry/foo.example.org', None),
+])
+def test_lookup(snapshot, image, prefix):
+    with cli.CompiledRegistries(str(snapshot[3])) as c:
+        reg = c.lookup(image)
+        assert (reg and reg.prefix) == prefix
+
+
+def test_stale(snapshot):
+    conf, daemon, missing, snap = snapshot
+    subprocess.check_call('registries-conf-ctl check-compiled {s}'.format(s=snap), shell=True)
+
+    missing.write(u'')
+    with pytest.raises(cli.StaleSnapshotError):
+        cli.CompiledRegistries(str(snap))
+    missing.remove()
+    with cli.CompiledRegistries(str(snap)):
+        pass
+
+    subprocess.check_call('registries-conf-ctl --conf {c} add-registry example.com --insecure'.format(c=conf),
+                          shell=True)
+    with pytest.raises(cli.StaleSnapshotError):
+        cli.CompiledRegistries(str(snap))
+    assert subprocess.call('registries-conf-ctl check-compiled {s}'.format(s=snap), shell=True) == 1
+    with cli.CompiledRegistries(str(snap), check_sources=False):
+        pass
+
+
+def test_not_a_snapshot(tmpdir):
+    p = tmpdir.join('registries.conf')
+    p.write(registries_conf)
+    with pytest.raises(cli.CLIError, match='unknown file'):
+        cli.CompiledRegistries(str(p))
+
+
+def test_missing_snapshot(tmpdir):
+    snap = tmpdir.join('nope.snap')
+    with pytest.raises(cli.CLIError, match='Failed to load .*nope.snap'):
+        cli.CompiledRegistries(str(snap))
+    assert subprocess.call('registries-conf-ctl check-compiled {s}'.format(s=snap), shell=True) == 1
+
+
+@pytest.mark.parametrize('size', [10, 100, 200])
+def test_truncated_snapshot(snapshot, tmpdir, size):
+    truncated = tmpdir.join('truncated.snap')
+    truncated.write_binary(snapshot[3].read_binary()[:size])
+    with pytest.raises(cli.CLIError, match='truncated file'):
+        with cli.CompiledRegistries(str(truncated), check_sources=False) as c:
+            list(c)
+
+
+def test_export_errors(tmpdir):
+    conf = tmpdir.join('registries.conf')
+    conf.write(registries_conf)
+    with pytest.raises(cli.CLIError, match='Failed to write'):
+        cli.run_all({
+            '--conf': str(conf),
+            '--docker': False,
+            'export-compiled': True,
+            '<snapshot>': str(tmpdir.join('nope', 'registries.snap')),
+        })
+
+    # Unreadable files must not be skipped like missing ones.
+    with pytest.raises(cli.CLIError, match='Failed to read'):
+        cli.run_all({
+            '--conf': '{c},{d}'.format(c=conf, d=tmpdir),
+            '--docker': False,
+            'export-compiled': True,
+            '<snapshot>': str(tmpdir.join('registries.snap')),
+        })
+    assert tmpdir.listdir() == [conf]
+
+
+def test_relative_sources(tmpdir):
+    tmpdir.join('registries.conf').write(registries_conf)
+    subprocess.check_call('registries-conf-ctl --conf registries.conf export-compiled snap', shell=True,
+                          cwd=str(tmpdir))
+    with cli.CompiledRegistries(str(tmpdir.join('snap'))) as c:
+        assert c.sources() == [str(tmpdir.join('registries.conf'))]
+    subprocess.check_call('registries-conf-ctl check-compiled {s}'.format(s=tmpdir.join('snap')), shell=True,
+                          cwd='/')
+
+
+def test_changed_while_exporting(tmpdir):
+    conf = tmpdir.join('registries.conf')
+    conf.write(registries_conf)
+    sources = cli.CompiledRegistries.read_sources([str(conf)])
+    conf.write(u'unqualified-search-registries = ["docker.io"]')
+    snap = tmpdir.join('snap')
+    snap.write_binary(cli.CompiledRegistries.compile(cli.merged_config(sources, {'--docker': False}), sources))
+    with pytest.raises(cli.StaleSnapshotError):
+        cli.CompiledRegistries(str(snap))
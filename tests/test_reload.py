@@ -0,0 +1,124 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+from registries_conf_ctl import cli
+
+# Stand-in for dockerd / crio: counts SIGHUPs.
+runtime_script = u"""
+import os, signal, sys, time
+
+count, pidfile = sys.argv[1], sys.argv[2]
+
+def hup(signum, frame):
+    with open(count, 'a') as f:
+        f.write('x')
+
+signal.signal(signal.SIGHUP, hup)
+open(count, 'w').close()
+with open(pidfile + '.tmp', 'w') as f:
+    f.write(str(os.getpid()))
+os.rename(pidfile + '.tmp', pidfile)
+while True:
+    time.sleep(0.1)
+"""
+
+docker_in = u"""
+{
+    "something": 1
+}
+"""
+
+
+@pytest.fixture
+def runtime(tmpdir):
+    count = tmpdir.join('count')
+    pidfile = tmpdir.join('runtime.pid')
+    p = subprocess.Popen([sys.executable, '-c', runtime_script, str(count), str(pidfile)])
+    for _ in range(100):
+        if pidfile.check():
+            break
+        time.sleep(0.05)
+
+    def signals(wait=0.5):
+        time.sleep(wait)
+        return len(count.read())
+
+    yield pidfile, signals
+    p.kill()
+    p.wait()
+
+
+def test_reload_once_per_batch(runtime):
+    pidfile, signals = runtime
+    reloader = cli.Reloader({'docker': str(pidfile)})
+    reloader.mark('docker')
+    reloader.mark('docker')
+    reloader.flush()
+    assert signals() == 1
+    reloader.flush()
+    assert signals() == 1
+
+
+def test_reload_only_on_change(runtime, tmpdir):
+    pidfile, signals = runtime
+    p = tmpdir.join('daemon.json')
+    p.write(docker_in)
+    cmd = 'registries-conf-ctl --conf {p} --docker --reload --docker-pidfile {pidfile} {c}'
+
+    subprocess.check_call(cmd.format(p=p, pidfile=pidfile, c='add-mirror docker.io mirror:5000'), shell=True)
+    assert signals() == 1
+    subprocess.check_call(cmd.format(p=p, pidfile=pidfile, c='add-mirror docker.io mirror:5000'), shell=True)
+    assert signals() == 1
+    subprocess.check_call(cmd.format(p=p, pidfile=pidfile, c='add-mirror docker.io other:5000'), shell=True)
+    assert signals() == 2
+
+
+def test_reload_delay(runtime, tmpdir):
+    pidfile, signals = runtime
+    p = tmpdir.join('registries.conf')
+    p.write(u'')
+    cmd = 'registries-conf-ctl --conf {p} --reload --reload-delay 3 --reload-state {state} ' \
+          '--crio-pidfile {pidfile} add-registry {reg} --insecure'
+
+    for reg in ['a.example', 'b.example', 'c.example']:
+        subprocess.check_call(cmd.format(p=p, state=tmpdir.join('state'), pidfile=pidfile, reg=reg),
+                              shell=True)
+    assert signals(wait=0) == 0
+    assert signals(wait=4.5) == 1
+    assert not tmpdir.join('state', 'crio.pending').check()
+
+
+def test_reload_missing_pidfile(tmpdir):
+    reloader = cli.Reloader({'crio': str(tmpdir.join('nope.pid'))})
+    reloader.mark('crio')
+    with pytest.raises(cli.CLIError, match='Failed to reload crio'):
+        reloader.flush()
+
+
+def test_reload_delay_missing_pidfile(tmpdir):
+    p = tmpdir.join('registries.conf')
+    p.write(u'')
+    assert subprocess.call('registries-conf-ctl --conf {p} --reload --reload-delay 1 --reload-state {state} '
+                           '--crio-pidfile {pidfile} add-registry localhost --insecure'.format(
+                               p=p, state=tmpdir.join('state'), pidfile=tmpdir.join('nope.pid')),
+                           shell=True) == 1
+    assert not tmpdir.join('state').check()
+
+
+@pytest.mark.parametrize('arguments,msg', [
+    ({'--reload-delay': 'abc', '--reload-state': '/'}, 'Invalid --reload-delay'),
+    ({'--reload-delay': '-1', '--reload-state': '/'}, 'Invalid --reload-delay'),
+    ({'--reload-delay': 'nan', '--reload-state': '/'}, 'Invalid --reload-delay'),
+    ({'--reload-delay': 'inf', '--reload-state': '/'}, 'Invalid --reload-delay'),
+    ({'--reload-delay': '1', '--reload-state': '/dev/null/state'}, 'Failed to write /dev/null/state'),
+])
+def test_reload_invalid_arguments(runtime, arguments, msg):
+    pidfile, signals = runtime
+    arguments.update({'--docker-pidfile': str(pidfile), '--crio-pidfile': str(pidfile)})
+    with pytest.raises(cli.CLIError, match=msg):
+        reloader = cli.Reloader.from_arguments(arguments)
+        reloader.mark('crio')
+        reloader.flush()